@@ -1,9 +1,10 @@
 import os
 import uuid
+import click
 from datetime import datetime
 from dotenv import load_dotenv
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_bcrypt import Bcrypt
@@ -14,11 +15,16 @@ load_dotenv()
 # Tell Flask where to find the 'templates' folder.
 app = Flask(__name__, template_folder='../frontend/templates')
 app.config['SECRET_KEY'] = 'a_very_secret_key_that_should_be_changed'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///db.sqlite3'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3')
+# Buffered responses smaller than this (in bytes) are sent uncompressed.
+app.config['COMPRESS_MIN_SIZE'] = 1024
 
 # --- 2. IMPORT MODELS & SERVICES ---
 from models import db, bcrypt, User, ChatThread, ChatMessage
+from models import thread_messages_query, user_history_query, public_threads_query
 from ai_service import get_ai_response
+from responses import list_response, compress_response
+from events import InProcessBroker, format_sse
 
 # --- 3. INITIALIZE EXTENSIONS ---
 db.init_app(app)
@@ -27,6 +33,14 @@ bcrypt.init_app(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+# Gzip/brotli-compress large responses when the client accepts it
+app.after_request(compress_response)
+
+# Live update events (see /api/events). Swap for a broker-backed
+# implementation with the same publish()/subscribe() methods if the
+# app runs in more than one process.
+event_broker = InProcessBroker()
+
 # Flask-Login user loader
 @login_manager.user_loader
 def load_user(user_id):
@@ -51,6 +65,22 @@ def create_db():
             print("User 'testuser' already exists.")
         print("Database created!")
 
+@app.cli.command('seed-db')
+@click.option('--users', default=1000, show_default=True, help='Number of users to create.')
+@click.option('--threads', default=10000, show_default=True, help='Number of chat threads to create.')
+@click.option('--mean-messages', default=20, show_default=True, help='Average messages per thread (long-tailed).')
+@click.option('--max-messages', default=5000, show_default=True, help='Cap on messages in a single thread.')
+@click.option('--public-ratio', default=0.1, show_default=True, help='Share of threads that are public.')
+@click.option('--seed', type=int, default=None, help='Random seed, for reproducible data.')
+def seed_db(users, threads, mean_messages, max_messages, public_ratio, seed):
+    """Fills the database with synthetic users, threads and messages."""
+    from seed import seed_database
+
+    db.create_all()
+    seed_database(users, threads, mean_messages=mean_messages, max_messages=max_messages,
+                  public_ratio=public_ratio, seed=seed)
+    print("Seeding complete!")
+
 # --- 5. CORE CHAT API ENDPOINTS (FINAL SECURE VERSION) ---
 
 @app.route('/api/chat/start', methods=['POST'])
@@ -63,7 +93,7 @@ def start_chat():
     try:
         new_thread = ChatThread(user_id=user.id) # issue for thread 
         db.session.add(new_thread)
-        print(new_thread.id)
+        db.session.flush() # assigns new_thread.id
         starter_message = ChatMessage(
             thread_id=new_thread.id,
             role="assistant",
@@ -74,6 +104,12 @@ def start_chat():
         db.session.commit()
         print("test2")
         print(f"New chat thread created: {new_thread.id} for user {user.id}")
+        event_broker.publish(user.id, 'thread-created', {
+            "id": new_thread.id,
+            "title": "New Chat",
+            "created_at": new_thread.created_at.isoformat(),
+            "is_public": new_thread.is_public
+        })
         return jsonify({
             "thread_id": new_thread.id,
             "message": "New chat thread created.",
@@ -93,6 +129,8 @@ def post_message(thread_id):
     
     data = request.json
     user_message_content = data.get('message')
+    # Lets the sending tab recognise (and skip) the events for its own message
+    client_id = data.get('client_id')
 
     if not user_message_content:
         return jsonify({"error": "No message content provided"}), 400
@@ -114,6 +152,7 @@ def post_message(thread_id):
         )
         db.session.add(user_message)
         db.session.commit()
+        publish_message_created(current_user.id, user_message, client_id)
 
         # 2. Prepare context for AI (fetch all messages for this thread)
         messages_history = thread.messages
@@ -129,6 +168,7 @@ def post_message(thread_id):
         )
         db.session.add(ai_message)
         db.session.commit()
+        publish_message_created(current_user.id, ai_message, client_id)
 
         # 5. Return AI's response to the frontend
         return jsonify({"role": "assistant", "content": ai_response_content})
@@ -138,6 +178,17 @@ def post_message(thread_id):
         print(f"Error processing message: {e}")
         return jsonify({"error": str(e)}), 500
 
+def publish_message_created(user_id, message, client_id=None):
+    """ Tells the thread owner's other tabs/devices about a new message. """
+    event_broker.publish(user_id, 'message-created', {
+        "id": message.id,
+        "thread_id": message.thread_id,
+        "role": message.role,
+        "content": message.content,
+        "created_at": message.created_at.isoformat(),
+        "client_id": client_id
+    })
+
 @app.route('/api/chat/<string:thread_id>', methods=['GET'])
 @login_required # <-- RE-ENABLED SECURITY
 def get_chat_messages(thread_id):
@@ -153,17 +204,17 @@ def get_chat_messages(thread_id):
         if not thread.is_public:
             return jsonify({"error": "Authorization required to view this thread."}), 403
         
-    messages = thread.messages 
-    
-    messages_data = [
+    # Select only the columns we send and stream them off the cursor,
+    # instead of loading every ChatMessage object into memory first.
+    rows = db.session.execute(thread_messages_query(thread.id))
+
+    return list_response(
         {
-            "role": msg.role,
-            "content": msg.content,
-            "created_at": msg.created_at.isoformat()
-        } for msg in messages
-    ]
-    
-    return jsonify(messages_data)
+            "role": role,
+            "content": content,
+            "created_at": created_at.isoformat()
+        } for role, content, created_at in rows
+    )
 
 # --- 6. CHAT HISTORY & MANAGEMENT API (FINAL SECURE VERSION) ---
 
@@ -173,21 +224,24 @@ def get_user_history():
     """ Gets all chat threads for the currently logged-in user. """
     
     user_id = current_user.id
-    
-    threads = ChatThread.query.filter_by(user_id=user_id).order_by(ChatThread.created_at.desc()).all()
-    
-    history_data = []
-    for t in threads:
-        first_user_message = next((msg for msg in t.messages if msg.role == 'user'), None)
-        title = first_user_message.content[:30] + "..." if first_user_message else "New Chat"
-        
-        history_data.append({
-            "id": t.id,
-            "title": title,
-            "created_at": t.created_at.isoformat(),
-            "is_public": t.is_public # Send public status to UI
-        })
-    return jsonify(history_data)
+
+    # Taken before the query: the client resumes /api/events from here, so
+    # nothing committed after this snapshot is missed
+    event_position = event_broker.position(user_id)
+
+    # One query for all threads and their titles (no per-thread message loads)
+    rows = db.session.execute(user_history_query(user_id))
+
+    response = list_response(
+        {
+            "id": thread_id,
+            "title": preview + "..." if preview is not None else "New Chat",
+            "created_at": created_at.isoformat(),
+            "is_public": is_public # Send public status to UI
+        } for thread_id, created_at, is_public, preview in rows
+    )
+    response.headers['X-Last-Event-ID'] = event_position
+    return response
 
 @app.route('/api/thread/<string:thread_id>/delete', methods=['DELETE'])
 @login_required # <-- RE-ENABLED SECURITY
@@ -205,6 +259,7 @@ def delete_thread(thread_id):
     try:
         db.session.delete(thread)
         db.session.commit()
+        event_broker.publish(current_user.id, 'thread-deleted', {"id": thread_id})
         return jsonify({"message": "Thread deleted"}), 200
     except Exception as e:
         db.session.rollback()
@@ -226,6 +281,10 @@ def toggle_public(thread_id):
     try:
         thread.is_public = not thread.is_public # Flip the boolean
         db.session.commit()
+        event_broker.publish(current_user.id, 'visibility-toggled', {
+            "id": thread.id,
+            "is_public": thread.is_public
+        })
         return jsonify({"message": "Visibility updated", "is_public": thread.is_public}), 200
     except Exception as e:
         db.session.rollback()
@@ -235,23 +294,43 @@ def toggle_public(thread_id):
 def get_public_threads():
     """ Gets all threads that are marked as public. """
     # This remains unsecured so logged-out users can view the public feed.
-    threads = ChatThread.query.filter_by(is_public=True).order_by(ChatThread.created_at.desc()).all()
-    
-    public_data = []
-    for t in threads:
-        first_user_message = next((msg for msg in t.messages if msg.role == 'user'), None)
-        title = first_user_message.content[:30] + "..." if first_user_message else "Public Chat"
-        
-        public_data.append({
-            "id": t.id,
-            "title": title,
-            "author_username": t.user.username,
-            "created_at": t.created_at.isoformat()
-        })
-    return jsonify(public_data)
+    rows = db.session.execute(public_threads_query())
+
+    return list_response(
+        {
+            "id": thread_id,
+            "title": preview + "..." if preview is not None else "Public Chat",
+            "author_username": username,
+            "created_at": created_at.isoformat()
+        } for thread_id, created_at, username, preview in rows
+    )
+
+
+# --- 7. LIVE UPDATES (SERVER-SENT EVENTS) ---
+
+@app.route('/api/events', methods=['GET'])
+@login_required
+def stream_events():
+    """ Streams the logged-in user's thread/message events as Server-Sent Events. """
+
+    # EventSource sends Last-Event-ID by itself when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or None
+
+    # Subscribe now, before the stream opens, so no event slips through in between
+    events = event_broker.subscribe(current_user.id, last_event_id)
+
+    def generate():
+        yield "retry: 3000\n\n"
+        for event in events:
+            yield format_sse(event) if event else ": keep-alive\n\n"
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # Stop proxies from buffering the stream
+    })
 
 
-# --- 7. AUTH & PAGE ROUTES ---
+# --- 8. AUTH & PAGE ROUTES ---
 
 @app.route('/')
 @login_required 
@@ -326,7 +405,7 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
-# --- 8. APP RUNNER ---
+# --- 9. APP RUNNER ---
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+DB-layer micro-benchmarks for the queries behind each endpoint in app.py.
+
+Times the ORM work of history listing, the public feed, loading a thread,
+deleting a thread (with its message cascade) and the login lookup, and
+counts the SQL statements each one issues. Every case runs against the
+heaviest data in the database: the user with the most threads and the
+longest thread.
+
+Point it at a seeded database (see `flask seed-db`) to get realistic numbers:
+
+    DATABASE_URL=sqlite:////tmp/seed.db python bench_queries.py [rounds]
+
+With no DATABASE_URL it uses an in-memory database with a small seeded dataset.
+Deletes are flushed and then rolled back, so the data is left untouched.
+"""
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from sqlalchemy import event
+
+from app import app
+from models import db, User, ChatThread, ChatMessage
+from models import thread_messages_query, user_history_query, public_threads_query
+from seed import seed_database
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+
+class QueryCounter:
+    """Counts the SQL statements sent to the database."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def pick_targets():
+    """The user with the most threads, and the longest thread."""
+    user_id = db.session.scalar(
+        db.select(ChatThread.user_id).group_by(ChatThread.user_id)
+        .order_by(db.func.count().desc()).limit(1)
+    )
+    thread_id = db.session.scalar(
+        db.select(ChatMessage.thread_id).group_by(ChatMessage.thread_id)
+        .order_by(db.func.count().desc()).limit(1)
+    )
+    return db.session.get(User, user_id), thread_id
+
+
+def run(name, fn, counter):
+    """Runs fn ROUNDS times after a warm-up, with a fresh session each time, and prints a result row."""
+    fn()
+    db.session.rollback()
+    db.session.expunge_all()
+
+    timings, queries = [], []
+    for _ in range(ROUNDS):
+        counter.count = 0
+        start = time.perf_counter()
+        rows = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        # Like the end of a request: drop loaded objects (and undo deletes)
+        db.session.rollback()
+        db.session.expunge_all()
+
+    print(f"{name:<18}{min(timings):>10.2f}{max(timings):>10.2f}{statistics.mean(timings):>10.2f}"
+          f"{statistics.median(timings):>10.2f}{max(queries):>9}{rows:>9}")
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        if not db.session.scalar(db.select(db.func.count()).select_from(ChatThread)):
+            print("Database is empty, seeding a small dataset...")
+            seed_database(200, 2000, seed=42, log=lambda message: None)
+
+        user, thread_id = pick_targets()
+        username, user_id = user.username, user.id
+        db.session.expunge_all()
+        counter = QueryCounter(db.engine)
+
+        def history_listing():
+            return len(db.session.execute(user_history_query(user_id)).all())
+
+        def public_feed():
+            return len(db.session.execute(public_threads_query()).all())
+
+        def thread_load():
+            thread = db.session.get(ChatThread, thread_id)
+            return len(db.session.execute(thread_messages_query(thread.id)).all())
+
+        def delete_cascade():
+            thread = db.session.get(ChatThread, thread_id)
+            db.session.delete(thread)
+            db.session.flush()
+            return len(thread.messages)
+
+        def login_lookup():
+            return 1 if User.query.filter_by(username=username).first() else 0
+
+        print(f"{ROUNDS} rounds per case, times in ms\n")
+        print(f"{'case':<18}{'min':>10}{'max':>10}{'mean':>10}{'median':>10}{'queries':>9}{'rows':>9}")
+        run("history listing", history_listing, counter)
+        run("public feed", public_feed, counter)
+        run("thread load", thread_load, counter)
+        run("delete cascade", delete_cascade, counter)
+        run("login lookup", login_lookup, counter)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for the chat API's response encodings.
+
+Seeds a throwaway in-memory database with a single 10k-message thread and
+fetches it through GET /api/chat/<id> with different Accept / Accept-Encoding
+headers. For each variant it reports bytes on the wire, serialization CPU
+time and peak Python memory (tracemalloc), next to the old approach of
+building the whole list and running jsonify over it.
+
+Run it from the backend folder:  python bench_serialization.py [num_messages]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Use a throwaway database and don't require a real OpenAI key to import the app.
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from flask import jsonify
+
+from app import app
+from models import db, User, ChatThread, ChatMessage
+
+NUM_MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+VARIANTS = [
+    ("json", {}),
+    ("json + gzip", {"Accept-Encoding": "gzip"}),
+    ("json + br", {"Accept-Encoding": "br"}),
+    ("msgpack", {"Accept": "application/msgpack"}),
+    ("msgpack + gzip", {"Accept": "application/msgpack", "Accept-Encoding": "gzip"}),
+    ("msgpack + br", {"Accept": "application/msgpack", "Accept-Encoding": "br"}),
+]
+
+
+def seed_thread():
+    """Creates a user with one long thread and returns (user, thread_id)."""
+    db.create_all()
+    user = User(username='bench')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.flush()
+
+    thread = ChatThread(user_id=user.id)
+    db.session.add(thread)
+    db.session.flush()
+
+    start = datetime.utcnow()
+    db.session.execute(db.insert(ChatMessage), [
+        {
+            "thread_id": thread.id,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i}: " + "lorem ipsum dolor sit amet " * (3 + i % 20),
+            "created_at": start + timedelta(seconds=i),
+        } for i in range(NUM_MESSAGES)
+    ])
+    db.session.commit()
+    return user, thread.id
+
+
+def measure(fn):
+    """Runs fn() and returns (result, cpu_seconds, peak_bytes)."""
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    result = fn()
+    cpu = time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def baseline(thread_id):
+    """The old implementation: load every ChatMessage, build a list, jsonify it."""
+    with app.test_request_context():
+        thread = db.session.get(ChatThread, thread_id)
+        messages_data = [
+            {
+                "role": msg.role,
+                "content": msg.content,
+                "created_at": msg.created_at.isoformat()
+            } for msg in thread.messages
+        ]
+        return len(jsonify(messages_data).get_data())
+
+
+def fetch(client, thread_id, headers):
+    response = client.get(f'/api/chat/{thread_id}', headers=headers)
+    assert response.status_code == 200, response.status_code
+    # Drain the (possibly streamed) body, still compressed, to count wire bytes.
+    return len(b''.join(response.response))
+
+
+def main():
+    with app.app_context():
+        user, thread_id = seed_thread()
+
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench', 'password': 'bench'})
+
+        print(f"Thread with {NUM_MESSAGES} messages\n")
+        print(f"{'variant':<20}{'bytes':>12}{'cpu ms':>10}{'peak KiB':>12}")
+
+        size, cpu, peak = measure(lambda: baseline(thread_id))
+        print(f"{'jsonify (old)':<20}{size:>12}{cpu * 1000:>10.1f}{peak / 1024:>12.0f}")
+        db.session.expunge_all()
+
+        for name, headers in VARIANTS:
+            size, cpu, peak = measure(lambda: fetch(client, thread_id, headers))
+            print(f"{name:<20}{size:>12}{cpu * 1000:>10.1f}{peak / 1024:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
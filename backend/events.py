@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+Event = namedtuple('Event', ['id', 'type', 'data'])
+
+# Type of the event sent when a client's Last-Event-ID can't be replayed (too
+# old, from before a server restart, or malformed). It carries the current
+# position as its id, so the client re-fetches the whole resource once and
+# then resumes normally from there.
+RESYNC = 'resync'
+
+
+class _UserChannel:
+    """One user's recent events and the Condition their subscribers wait on."""
+
+    def __init__(self, since, history_size):
+        self.condition = threading.Condition()
+        self.history = deque(maxlen=history_size)  # (seq, Event) pairs
+        self.since = since  # every event after this seq is in history (or still to come)
+        self.last_seq = since
+        self.last_active = time.monotonic()
+
+
+class InProcessBroker:
+    """
+    Per-user pub/sub for live updates, kept in this process's memory.
+
+    Event ids look like '<boot_id>-<n>': boot_id is picked when the broker is
+    created and n counts up across the whole process, so a reconnecting
+    client can resume from its Last-Event-ID, and ids from an earlier process
+    are recognised as such. A user's channel (and its history) is dropped
+    once nobody has subscribed to or published on it for `idle_ttl` seconds;
+    a client coming back later gets a resync.
+
+    This only works with a single server process: to run several, swap it
+    for an object with the same publish()/subscribe()/position() methods
+    backed by a local broker (e.g. Redis pub/sub).
+    """
+
+    def __init__(self, history_size=500, idle_ttl=600):
+        self.history_size = history_size
+        self.idle_ttl = idle_ttl
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()  # guards _seq, _channels and _last_sweep
+        self._seq = 0
+        self._channels = {}  # user_id -> _UserChannel
+        self._last_sweep = time.monotonic()
+
+    def _channel(self, user_id):
+        """Returns the user's channel (creating it if needed) and marks it active."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.idle_ttl / 2:
+                self._evict_idle(now)
+            channel = self._channels.get(user_id)
+            if channel is None:
+                channel = self._channels[user_id] = _UserChannel(self._seq, self.history_size)
+            channel.last_active = now
+            return channel
+
+    def _evict_idle(self, now):
+        # Live subscribers touch their channel on every keep-alive, so only
+        # channels nobody is listening to get this old.
+        self._last_sweep = now
+        for user_id, channel in list(self._channels.items()):
+            if now - channel.last_active > self.idle_ttl:
+                del self._channels[user_id]
+
+    def _parse_event_id(self, event_id):
+        """Returns the seq from one of our event ids, or None if it's from another process."""
+        boot_id, _, seq = str(event_id).rpartition('-')
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def position(self, user_id):
+        """
+        The event id a client can resume from to see everything published
+        after this call. Take it before reading the state you send the client.
+        """
+        self._channel(user_id)
+        with self._lock:
+            return f"{self.boot_id}-{self._seq}"
+
+    def publish(self, user_id, event_type, data):
+        """Records an event for a user and wakes up their subscribers."""
+        channel = self._channel(user_id)
+        with channel.condition:
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+            event = Event(f"{self.boot_id}-{seq}", event_type, data)
+            if len(channel.history) == channel.history.maxlen:
+                channel.since = channel.history[0][0]
+            channel.history.append((seq, event))
+            channel.last_seq = seq
+            channel.condition.notify_all()
+        return event
+
+    def subscribe(self, user_id, last_event_id=None, timeout=15):
+        """
+        Starts a subscription to a user's events and returns a generator of them.
+
+        The starting point is fixed when this is called (not when the generator
+        is first iterated), so nothing published in between is missed. Replays
+        events after last_event_id if given, or yields a resync event first if
+        they are no longer available. Yields None whenever `timeout` seconds
+        pass without an event, so the caller can send a keep-alive.
+        """
+        channel = self._channel(user_id)
+        with channel.condition:
+            cursor = channel.last_seq
+            resync = False
+            if last_event_id is not None:
+                seq = self._parse_event_id(last_event_id)
+                if seq is not None and channel.since <= seq <= cursor:
+                    cursor = seq
+                else:
+                    resync = True
+
+        return self._listen(user_id, channel, cursor, resync, timeout)
+
+    def _listen(self, user_id, channel, cursor, resync, timeout):
+        if resync:
+            yield Event(f"{self.boot_id}-{cursor}", RESYNC, {})
+
+        while True:
+            # Refreshes last_active, and picks up a new channel if ours was evicted
+            current = self._channel(user_id)
+            if current is not channel:
+                channel = current
+                if cursor < channel.since:
+                    cursor = channel.last_seq
+                    yield Event(f"{self.boot_id}-{cursor}", RESYNC, {})
+
+            with channel.condition:
+                channel.condition.wait_for(lambda: channel.last_seq > cursor, timeout)
+                pending = [(seq, e) for seq, e in channel.history if seq > cursor]
+
+            if not pending:
+                yield None
+                continue
+            for seq, event in pending:
+                cursor = seq
+                yield event
+
+
+def format_sse(event):
+    """Formats an Event as a Server-Sent Events message."""
+    lines = []
+    if event.id is not None:
+        lines.append(f"id: {event.id}")
+    lines.append(f"event: {event.type}")
+    lines.append(f"data: {json.dumps(event.data)}")
+    return "\n".join(lines) + "\n\n"
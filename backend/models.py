@@ -32,8 +32,9 @@ class ChatThread(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    is_public = db.Column(db.Boolean, nullable=False, default=False)
     
-    messages = db.relationship('ChatMessage', backref='thread', lazy=True, order_by='ChatMessage.created_at')
+    messages = db.relationship('ChatMessage', backref='thread', lazy=True, order_by='ChatMessage.created_at', cascade='all, delete-orphan')
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_message' # <-- 3. RENAMED TABLE
@@ -43,4 +44,47 @@ class ChatMessage(db.Model):
     thread_id = db.Column(db.String(36), db.ForeignKey('chat_thread.id'), nullable=False)
     role = db.Column(db.String(10), nullable=False)  # 'user' or 'assistant'
     content = db.Column(db.Text, nullable=False) # <-- 8. RENAMED 'message' to 'content'
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# --- QUERIES BEHIND THE LIST ENDPOINTS ---
+# Shared by app.py and bench_queries.py so the benchmarks time exactly what the API runs.
+
+def first_user_message_preview():
+    """Correlated subquery: first 30 chars of a thread's first user message."""
+    return (
+        db.select(db.func.substr(ChatMessage.content, 1, 30))
+        .where(ChatMessage.thread_id == ChatThread.id, ChatMessage.role == 'user')
+        .order_by(ChatMessage.created_at)
+        .limit(1)
+        .correlate(ChatThread)
+        .scalar_subquery()
+    )
+
+def thread_messages_query(thread_id):
+    """(role, content, created_at) rows of a thread, oldest first."""
+    return (
+        db.select(ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+        .filter_by(thread_id=thread_id)
+        .order_by(ChatMessage.created_at)
+        .execution_options(yield_per=500)
+    )
+
+def user_history_query(user_id):
+    """(id, created_at, is_public, title preview) rows of a user's threads, newest first."""
+    return (
+        db.select(ChatThread.id, ChatThread.created_at, ChatThread.is_public, first_user_message_preview())
+        .filter_by(user_id=user_id)
+        .order_by(ChatThread.created_at.desc())
+        .execution_options(yield_per=500)
+    )
+
+def public_threads_query():
+    """(id, created_at, author username, title preview) rows of public threads, newest first."""
+    return (
+        db.select(ChatThread.id, ChatThread.created_at, User.username, first_user_message_preview())
+        .join(User, ChatThread.user_id == User.id)
+        .filter(ChatThread.is_public == True)
+        .order_by(ChatThread.created_at.desc())
+        .execution_options(yield_per=500)
+    )
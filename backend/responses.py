@@ -0,0 +1,150 @@
+import itertools
+import json
+import zlib
+
+from flask import Response, current_app, request, stream_with_context
+
+# Brotli and MessagePack are optional: without them the API falls back to
+# gzip-compressed (or plain) JSON.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Rows are buffered into chunks of roughly this size before being written out.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Brotli's default (11) is far too slow for per-request compression.
+BROTLI_QUALITY = 5
+
+
+def choose_encoding():
+    """Picks 'br' or 'gzip' from the request's Accept-Encoding, or None."""
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offers)
+
+
+def wants_msgpack():
+    """True if the client prefers MessagePack over JSON (and we can produce it)."""
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+def compress(data, encoding):
+    """Compresses a whole body in one go."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding):
+    """Compresses a stream of chunks incrementally, without buffering the whole body."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _json_array_chunks(rows):
+    """Serializes rows into a JSON array, one buffered chunk at a time."""
+    buffer = [b'[']
+    size = 1
+    separator = b''
+    for row in rows:
+        encoded = separator + json.dumps(row, separators=(',', ':')).encode('utf-8')
+        separator = b','
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(b']')
+    yield b''.join(buffer)
+
+
+def list_response(rows):
+    """
+    Builds a response for an iterable of row dicts.
+
+    JSON is streamed: rows are serialized as they come off the query cursor
+    and compressed on the fly if the client accepts gzip or brotli. A body
+    that fits in a single chunk is sent buffered instead, so it gets the same
+    COMPRESS_MIN_SIZE treatment as any other response in compress_response().
+    MessagePack needs the row count up front, so that body is built in one go
+    and compressed by compress_response() like any other response.
+    """
+    if wants_msgpack():
+        response = Response(msgpack.packb(list(rows)), mimetype=MSGPACK_MIMETYPE)
+        response.vary.add('Accept')
+        return response
+
+    chunks = _json_array_chunks(rows)
+    first = next(chunks)
+    second = next(chunks, None)
+    if second is None:
+        response = Response(first, mimetype=JSON_MIMETYPE)
+        response.vary.add('Accept-Encoding')
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+    chunks = itertools.chain((first, second), chunks)
+
+    encoding = choose_encoding()
+    if encoding:
+        chunks = _compress_stream(chunks, encoding)
+
+    response = Response(stream_with_context(chunks), mimetype=JSON_MIMETYPE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response
+
+
+def compress_response(response):
+    """
+    after_request hook: compresses buffered responses larger than
+    COMPRESS_MIN_SIZE bytes. Streamed responses are left alone, since
+    list_response() already compresses those.
+    """
+    if (
+        response.is_streamed
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or not 200 <= response.status_code < 300
+        or response.status_code == 204
+    ):
+        return response
+
+    min_size = current_app.config.get('COMPRESS_MIN_SIZE', 1024)
+    if response.content_length is None or response.content_length < min_size:
+        return response
+
+    encoding = choose_encoding()
+    if not encoding:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,140 @@
+"""
+Synthetic data generator for local, production-scale testing.
+
+Creates users, threads and messages with bulk inserts, in batches, so
+millions of rows can be generated without holding them all in memory.
+The distributions aim to look like real usage:
+
+- threads per user follow a power law (a few heavy users, many light ones)
+- messages per thread follow a log-normal (most threads are short, with a
+  long tail of very long ones); some threads only have the starter message
+- a share of threads is public
+
+Run through the Flask CLI:  flask seed-db --users 10000 --threads 100000
+"""
+import math
+import random
+from array import array
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, bcrypt, User, ChatThread, ChatMessage
+
+STARTER_MESSAGE = "Hello! How can I help you today?"
+
+WORDS = (
+    "the a to of and in is it you that for on with as this how can what why "
+    "python flask query thread message database index please explain example "
+    "error code function help fix write list table user data time make best"
+).split()
+
+
+def _word_pool(rng, size=100_000):
+    """A long random word sequence; message text is sliced out of it (much faster than per-word choices)."""
+    return rng.choices(WORDS, k=size)
+
+
+def _sentence(rng, pool, num_words):
+    num_words = min(num_words, len(pool))
+    start = rng.randrange(len(pool) - num_words + 1)
+    return " ".join(pool[start:start + num_words]).capitalize() + "."
+
+
+def _message_length(rng, role):
+    """Number of words in a message: user prompts are short, replies longer."""
+    if role == 'user':
+        return max(1, int(rng.lognormvariate(2.3, 0.8)))
+    return max(5, int(rng.lognormvariate(4.0, 0.7)))
+
+
+def _messages_per_thread(rng, mean, max_messages):
+    """Log-normal thread length with the given mean, at least the starter message."""
+    sigma = 1.0
+    mu = math.log(max(mean, 1)) - sigma ** 2 / 2
+    return max(1, min(max_messages, int(rng.lognormvariate(mu, sigma))))
+
+
+def _insert_batch(model, rows):
+    # Core insert on the table: skips the ORM's per-row bookkeeping
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
+        db.session.commit()
+
+
+def seed_database(num_users, num_threads, mean_messages=20, max_messages=5000,
+                  public_ratio=0.1, batch_size=10_000, seed=None, log=print):
+    """
+    Bulk-inserts synthetic users, threads and messages into the current app's database.
+
+    All seeded users are named 'seed_user_<n>' and share the password 'password'
+    (hashed once, since bcrypt is deliberately slow). Returns a dict of row counts.
+    """
+    rng = random.Random(seed)
+    pool = _word_pool(rng)
+    password_hash = bcrypt.generate_password_hash('password').decode('utf-8')
+
+    # The database assigns user ids (so sequences such as Postgres's stay in step);
+    # only the number suffix of the username comes from here.
+    max_id_before = db.session.scalar(db.select(db.func.max(User.id))) or 0
+    user_rows = []
+    for i in range(num_users):
+        user_rows.append({
+            "username": f"seed_user_{max_id_before + 1 + i}",
+            "password": password_hash
+        })
+        if len(user_rows) >= batch_size:
+            _insert_batch(User, user_rows)
+            user_rows = []
+    _insert_batch(User, user_rows)
+    log(f"Inserted {num_users} users.")
+
+    # Read the new ids back into a compact int array (8 bytes per user)
+    user_ids = array('q', db.session.scalars(
+        db.select(User.id)
+        .where(User.id > max_id_before, User.username.like('seed_user_%'))
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    ))
+
+    now = datetime.utcnow()
+    thread_rows, message_rows = [], []
+    num_messages = 0
+    for n in range(1, num_threads + 1):
+        # Power-law activity: owners are drawn with rank ~ u**3, so low ranks
+        # (the heavy users) get most threads and the rest form a long tail
+        user_id = user_ids[int(len(user_ids) * rng.random() ** 3)]
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        thread_id = str(uuid.uuid4())
+        thread_rows.append({
+            "id": thread_id,
+            "user_id": user_id,
+            "created_at": created_at,
+            "is_public": rng.random() < public_ratio
+        })
+
+        # Every thread opens with the assistant's starter message, like start_chat()
+        message_time = created_at
+        for i in range(_messages_per_thread(rng, mean_messages, max_messages)):
+            role = 'assistant' if i % 2 == 0 else 'user'
+            content = STARTER_MESSAGE if i == 0 else _sentence(rng, pool, _message_length(rng, role))
+            message_rows.append({
+                "thread_id": thread_id,
+                "role": role,
+                "content": content,
+                "created_at": message_time
+            })
+            message_time += timedelta(seconds=rng.randint(2, 120))
+        num_messages += i + 1
+
+        # Threads go first so messages never reference a missing thread
+        if len(message_rows) >= batch_size or len(thread_rows) >= batch_size:
+            _insert_batch(ChatThread, thread_rows)
+            _insert_batch(ChatMessage, message_rows)
+            thread_rows, message_rows = [], []
+            log(f"  ...{n}/{num_threads} threads, {num_messages} messages")
+
+    _insert_batch(ChatThread, thread_rows)
+    _insert_batch(ChatMessage, message_rows)
+    log(f"Inserted {num_threads} threads and {num_messages} messages.")
+
+    return {"users": num_users, "threads": num_threads, "messages": num_messages}